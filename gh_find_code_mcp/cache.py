@@ -0,0 +1,155 @@
+import hashlib
+import os
+import queue
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Hashable
+
+import orjson
+
+
+class TTLCache:
+    """A small LRU cache whose entries expire after ``ttl`` seconds."""
+
+    def __init__(self, ttl: float, maxsize: int):
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self._data: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+
+    def get(self, key: Hashable) -> Any | None:
+        entry = self._data.get(key)
+        if entry is None:
+            return None
+        expiry, value = entry
+        if expiry <= time.monotonic():
+            del self._data[key]
+            return None
+        self._data.move_to_end(key)
+        return value
+
+    def set(self, key: Hashable, value: Any, expiry: float | None = None):
+        """Cache ``value``, until the wall-clock time ``expiry`` if given."""
+        if self.maxsize <= 0 or self.ttl <= 0:
+            return
+        ttl = self.ttl if expiry is None else expiry - time.time()
+        if ttl <= 0:
+            return
+        self._data[key] = (time.monotonic() + ttl, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def clear(self):
+        self._data.clear()
+
+
+class DiskCache:
+    """A sqlite-backed cache of search payloads that survives restarts.
+
+    Writes are queued and committed in batches by a background thread so
+    that callers never wait on sqlite. Entries that have been queued but
+    not yet committed are served from memory.
+    """
+
+    BATCH_SIZE = 64
+    FLUSH_INTERVAL = 0.2
+
+    def __init__(self, path: str, ttl: float):
+        self.ttl = ttl
+        self.path = path
+        # Results can include private repositories, so keep the cache private.
+        directory = os.path.dirname(path)
+        os.makedirs(directory, mode=0o700, exist_ok=True)
+        os.chmod(directory, 0o700)
+        os.close(os.open(path, os.O_RDWR | os.O_CREAT, 0o600))
+        os.chmod(path, 0o600)
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS cache "
+            "(key TEXT PRIMARY KEY, expiry REAL, payload TEXT)"
+        )
+        self._db.commit()
+        self._queue: queue.Queue[tuple[str, float, str] | None] = queue.Queue()
+        self._pending: dict[str, tuple[float, str]] = {}
+        self._lock = threading.Lock()
+        self._writer = threading.Thread(target=self._writer_loop, daemon=True)
+        self._writer.start()
+
+    @staticmethod
+    def _key(key: tuple) -> str:
+        return hashlib.blake2b(orjson.dumps(key), digest_size=16).hexdigest()
+
+    def get(self, key: tuple) -> tuple[float, str] | None:
+        """Return ``(expiry, payload)`` for a live entry, or None."""
+        digest = self._key(key)
+        now = time.time()
+        with self._lock:
+            entry = self._pending.get(digest)
+        if entry is not None:
+            return entry if entry[0] > now else None
+        row = self._db.execute(
+            "SELECT expiry, payload FROM cache WHERE key=? AND expiry>?",
+            (digest, now),
+        ).fetchone()
+        return row
+
+    def set(self, key: tuple, payload: str):
+        if self.ttl <= 0:
+            return
+        item = (self._key(key), time.time() + self.ttl, payload)
+        with self._lock:
+            self._pending[item[0]] = item[1:]
+        self._queue.put(item)
+
+    def close(self):
+        """Flush queued writes and stop the writer thread."""
+        self._queue.put(None)
+        self._writer.join()
+
+    def _next_batch(self) -> tuple[list[tuple[str, float, str]], bool]:
+        item = self._queue.get()
+        if item is None:
+            return [], True
+        batch = [item]
+        deadline = time.monotonic() + self.FLUSH_INTERVAL
+        while len(batch) < self.BATCH_SIZE:
+            timeout = deadline - time.monotonic()
+            if timeout <= 0:
+                break
+            try:
+                item = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                break
+            if item is None:
+                return batch, True
+            batch.append(item)
+        return batch, False
+
+    def _writer_loop(self):
+        db = sqlite3.connect(self.path, isolation_level=None)
+        db.execute("PRAGMA synchronous=NORMAL")
+        done = False
+        while not done:
+            batch, done = self._next_batch()
+            if not batch:
+                continue
+            try:
+                db.execute("BEGIN IMMEDIATE")
+                db.execute("DELETE FROM cache WHERE expiry<?", (time.time(),))
+                db.executemany(
+                    "INSERT OR REPLACE INTO cache (key, expiry, payload) VALUES (?, ?, ?)",
+                    batch,
+                )
+                db.execute("COMMIT")
+            except sqlite3.Error:
+                if db.in_transaction:
+                    db.execute("ROLLBACK")
+            with self._lock:
+                for digest, expiry, payload in batch:
+                    if self._pending.get(digest) == (expiry, payload):
+                        del self._pending[digest]
+        db.close()
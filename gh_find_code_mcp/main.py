@@ -1,14 +1,75 @@
 import argparse
+import asyncio
+import functools
+import hashlib
 import json
 import os
+import shlex
 import shutil
+import sqlite3
 import subprocess
 import sys
+import threading
+from itertools import chain
 
+import httpx
+import orjson
 from mcp.server.fastmcp import FastMCP
+from pydantic import BaseModel, ConfigDict
+
+from .cache import DiskCache, TTLCache
 
 CONFIG_DIR = os.path.expanduser("~/.config/gh-find-code-mcp")
 CONFIG_FILE = os.path.join(CONFIG_DIR, "config.json")
+CACHE_DIR = os.path.expanduser("~/.cache/gh-find-code-mcp")
+CACHE_FILE = os.path.join(CACHE_DIR, "search.sqlite")
+
+CACHE_TTL = float(os.environ.get("GHFC_CACHE_TTL", "300"))
+CACHE_SIZE = int(os.environ.get("GHFC_CACHE_SIZE", "256"))
+# Run searches on the blocking client in a worker thread instead of asynchronously.
+SYNC_SEARCH = os.environ.get("GHFC_SYNC", "") not in ("", "0")
+MAX_CONCURRENT_SEARCHES = 8
+MAX_DESCRIPTION = 200
+NO_RESULTS = "No repositories found. Try broader or different search terms."
+
+# gh searches this host; the API client is only used when it is github.com.
+GH_HOST = os.environ.get("GH_HOST", "").strip().lower() or "github.com"
+SEARCH_URL = "https://api.github.com/search/repositories"
+RATE_LIMIT_URL = "https://api.github.com/rate_limit"
+_GH_BASE_ARGS = ("search", "repos")
+_GH_NOT_FOUND = "Error: gh CLI not found. Run: gh-find-code-mcp --set-gh /path/to/gh"
+_SEARCH_OPERATORS = frozenset(("AND", "OR", "NOT"))
+_GH_JSON_FIELDS = "fullName,description,stargazersCount,language,url"
+# gh only needs to find its config, credentials (including the keyring over
+# D-Bus) and any proxy, so don't copy the whole environment into each child.
+_GH_ENV_KEYS = (
+    "PATH", "HOME", "GH_TOKEN", "GITHUB_TOKEN", "GH_ENTERPRISE_TOKEN",
+    "GITHUB_ENTERPRISE_TOKEN", "GH_HOST", "GH_CONFIG_DIR",
+    "XDG_CONFIG_HOME", "XDG_RUNTIME_DIR", "DBUS_SESSION_BUS_ADDRESS",
+    # Windows: gh keeps its config under %AppData% and Go networking needs SYSTEMROOT.
+    "SYSTEMROOT", "APPDATA", "LOCALAPPDATA", "USERPROFILE",
+    "HTTP_PROXY", "http_proxy", "HTTPS_PROXY", "https_proxy",
+    "ALL_PROXY", "all_proxy", "NO_PROXY", "no_proxy",
+    "SSL_CERT_FILE", "SSL_CERT_DIR",
+)
+_GH_ENV = {k: os.environ[k] for k in _GH_ENV_KEYS if k in os.environ}
+
+_config: dict | None = None
+_gh_path: str | None = None
+
+_cache = TTLCache(CACHE_TTL, CACHE_SIZE)
+_disk_cache: DiskCache | None = None
+
+_token: str | None = None
+_token_loaded = False
+_token_lock = threading.Lock()
+_cache_scope: str | None = None
+_client: httpx.Client | None = None
+_client_lock = threading.Lock()
+_async_client: httpx.AsyncClient | None = None
+_async_client_lock = asyncio.Lock()
+_sem = asyncio.Semaphore(MAX_CONCURRENT_SEARCHES)
+_inflight: dict[tuple, asyncio.Task] = {}
 
 server = FastMCP(
     "gh-find-code-mcp",
@@ -21,28 +82,49 @@ server = FastMCP(
         "If you cannot find what you need in the results, DO NOT ask the user — "
         "refine your search with more specific terms, language filters, "
         "topic filters, or more precise keywords. "
-        "Keep searching with different queries until you find a good match."
+        "Keep searching with different queries until you find a good match. "
+        "When you have several related queries to try, send them together "
+        "with search_repos_batch rather than one search_repos call each."
     ),
 )
 
 
 def _load_config() -> dict:
-    if os.path.exists(CONFIG_FILE):
-        try:
-            with open(CONFIG_FILE, 'r') as f:
-                return json.load(f)
-        except:
-            pass
-    return {}
+    global _config
+    if _config is None:
+        _config = {}
+        if os.path.exists(CONFIG_FILE):
+            try:
+                with open(CONFIG_FILE, 'r') as f:
+                    _config = json.load(f)
+            except:
+                pass
+    return _config
 
 
 def _save_config(config: dict):
+    global _config, _gh_path
     os.makedirs(CONFIG_DIR, exist_ok=True)
     with open(CONFIG_FILE, 'w') as f:
         json.dump(config, f)
+    _config = config
+    _gh_path = None
 
 
 def _find_gh() -> str | None:
+    global _gh_path
+    if _gh_path is None:
+        _gh_path = _lookup_gh()
+    return _gh_path
+
+
+def _forget_gh():
+    # The binary moved or disappeared; look it up again on the next call.
+    global _gh_path
+    _gh_path = None
+
+
+def _lookup_gh() -> str | None:
     gh = shutil.which("gh")
     if gh:
         return gh
@@ -53,23 +135,312 @@ def _find_gh() -> str | None:
     return None
 
 
-def _run_gh(args: list[str]) -> str:
+class _SearchError(Exception):
+    """Raised when a search fails so that failures are never cached."""
+
+
+def _run_gh(args: list[str]) -> bytes:
     gh = _find_gh()
     if gh is None:
-        return "Error: gh CLI not found. Run: gh-find-code-mcp --set-gh /path/to/gh"
-    result = subprocess.run(
-        [gh, *args],
-        capture_output=True,
-        text=True,
-        timeout=30,
-    )
+        raise _SearchError(_GH_NOT_FOUND)
+    try:
+        result = subprocess.run(
+            [gh, *args],
+            capture_output=True,
+            timeout=30,
+            env=_GH_ENV,
+        )
+    except subprocess.TimeoutExpired:
+        raise _SearchError("Error: gh timed out")
+    except OSError:
+        _forget_gh()
+        raise _SearchError(_GH_NOT_FOUND)
     if result.returncode != 0:
-        return f"Error: {result.stderr.strip()}"
-    return result.stdout.strip()
+        raise _SearchError(f"Error: {result.stderr.decode(errors='replace').strip()}")
+    return result.stdout
+
+
+async def _run_gh_async(args: list[str]) -> bytes:
+    gh = _find_gh()
+    if gh is None:
+        raise _SearchError(_GH_NOT_FOUND)
+    try:
+        proc = await asyncio.create_subprocess_exec(
+            gh, *args,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+            env=_GH_ENV,
+        )
+    except OSError:
+        _forget_gh()
+        raise _SearchError(_GH_NOT_FOUND)
+    try:
+        stdout, stderr = await asyncio.wait_for(proc.communicate(), timeout=30)
+    except asyncio.TimeoutError:
+        proc.kill()
+        await proc.wait()
+        raise _SearchError("Error: gh timed out")
+    if proc.returncode != 0:
+        raise _SearchError(f"Error: {stderr.decode(errors='replace').strip()}")
+    return stdout
+
+
+def _get_token() -> str | None:
+    global _token, _token_loaded
+    with _token_lock:
+        if not _token_loaded:
+            # Enterprise hosts are searched through gh, which knows how to
+            # authenticate to them, so no token is ever sent to api.github.com.
+            if GH_HOST == "github.com":
+                _token = os.environ.get("GH_TOKEN") or os.environ.get("GITHUB_TOKEN") or None
+                if not _token:
+                    try:
+                        raw = _run_gh(["auth", "token", "--hostname", "github.com"])
+                        _token = raw.decode().strip() or None
+                    except _SearchError:
+                        pass
+            _token_loaded = True
+    return _token
+
+
+def _get_cache_scope() -> str:
+    """Identify the host and account whose results go in the disk cache."""
+    global _cache_scope
+    if _cache_scope is None:
+        token = _get_token()
+        if token is None:
+            try:
+                token = _run_gh(["auth", "token", "--hostname", GH_HOST]).decode().strip()
+            except _SearchError:
+                token = ""
+        digest = hashlib.blake2b(token.encode(), digest_size=8).hexdigest()
+        _cache_scope = f"{GH_HOST}:{digest}"
+    return _cache_scope
+
+
+def _api_headers(token: str) -> dict:
+    return {
+        "Accept": "application/vnd.github+json",
+        "Authorization": f"Bearer {token}",
+    }
+
+
+def _get_client() -> httpx.Client | None:
+    global _client
+    if _client is None:
+        # The warm-up thread and search worker threads may race to create it.
+        with _client_lock:
+            if _client is None:
+                token = _get_token()
+                if token is None:
+                    return None
+                _client = httpx.Client(http2=True, headers=_api_headers(token), timeout=30)
+    return _client
+
+
+async def _get_async_client() -> httpx.AsyncClient | None:
+    global _async_client
+    if _async_client is None:
+        async with _async_client_lock:
+            if _async_client is None:
+                # The first lookup may shell out to `gh auth token`.
+                token = _token if _token_loaded else await asyncio.to_thread(_get_token)
+                if token is None:
+                    return None
+                _async_client = httpx.AsyncClient(
+                    http2=True, headers=_api_headers(token), timeout=30
+                )
+    return _async_client
+
+
+def _quote(value: str) -> str:
+    # Quote multi-word values, as gh does, so GitHub reads them as one term.
+    if any(c.isspace() for c in value):
+        return f'"{value}"'
+    return value
+
+
+def _qualifier(name: str, value: str) -> str:
+    return f"{name}:{_quote(value)}"
+
+
+def _query_terms(query: str) -> list[str]:
+    """Split a query into words, keeping double-quoted phrases together.
+
+    Both backends send these terms the same way, so a query means the
+    same thing (and can share a cache entry) whichever one runs it.
+    """
+    lexer = shlex.shlex(query, posix=True)
+    lexer.quotes = '"'
+    lexer.whitespace_split = True
+    lexer.commenters = ""
+    try:
+        return list(lexer)
+    except ValueError:
+        # Unbalanced quote: treat every word separately.
+        return query.replace('"', " ").split()
+
+
+def _api_params(
+    query: str,
+    language: str,
+    topic: str,
+    owner: str,
+    sort: str,
+    limit: int,
+) -> dict:
+    terms = [_quote(t) for t in _query_terms(query)]
+    if language:
+        terms.append(_qualifier("language", language))
+    if topic:
+        terms += [_qualifier("topic", t) for t in topic.split(",")]
+    if owner:
+        terms.append(_qualifier("user", owner))
+    params = {"q": " ".join(terms), "per_page": limit}
+    if sort != "best-match":
+        params["sort"] = sort
+    return params
+
+
+def _parse_api(response: httpx.Response) -> list[dict]:
+    try:
+        data = orjson.loads(response.content)
+    except orjson.JSONDecodeError:
+        raise _SearchError(f"Error: HTTP {response.status_code} from GitHub")
+    if response.status_code != 200:
+        raise _SearchError(f"Error: {data.get('message', response.status_code)}")
+
+    return [
+        {
+            "name": r["full_name"],
+            "stars": r.get("stargazers_count", 0),
+            "language": r.get("language"),
+            "description": r.get("description"),
+            "url": r["html_url"],
+        }
+        for r in data.get("items", [])
+    ]
+
+
+def _gh_args(
+    query: str,
+    language: str,
+    topic: str,
+    owner: str,
+    sort: str,
+    limit: int,
+) -> list[str]:
+    # gh quotes any keyword containing whitespace, so pass each term separately.
+    args = [
+        *_GH_BASE_ARGS, *_query_terms(query), "--json", _GH_JSON_FIELDS, "--limit", str(limit),
+    ]
+    if sort != "best-match":
+        args += ["--sort", sort]
+    if language:
+        args += ["--language", language]
+    if topic:
+        args.extend(chain.from_iterable(("--topic", t) for t in topic.split(",")))
+    if owner:
+        args += ["--owner", owner]
+    return args
+
+
+def _parse_gh(raw: bytes) -> list[dict]:
+    try:
+        repos = orjson.loads(raw)
+    except orjson.JSONDecodeError:
+        raise _SearchError(raw.decode(errors="replace").strip())
+
+    return [
+        {
+            "name": r["fullName"],
+            "stars": r.get("stargazersCount", 0),
+            "language": r.get("language"),
+            "description": r.get("description"),
+            "url": r["url"],
+        }
+        for r in repos
+    ]
+
+
+def _format(repos: list[dict]) -> str:
+    if not repos:
+        return NO_RESULTS
+
+    results = []
+    for r in repos:
+        desc = r["description"] or ""
+        if len(desc) > MAX_DESCRIPTION:
+            desc = desc[:MAX_DESCRIPTION - 3] + "..."
+        results.append({
+            "name": r["name"],
+            "stars": r["stars"],
+            "language": r["language"],
+            "description": desc,
+            "url": r["url"],
+        })
+
+    return orjson.dumps({"count": len(results), "repos": results}).decode()
+
+
+def _search(
+    query: str,
+    language: str,
+    topic: str,
+    owner: str,
+    sort: str,
+    limit: int,
+) -> str:
+    client = _get_client()
+    if client is None:
+        raw = _run_gh(_gh_args(query, language, topic, owner, sort, limit))
+        return _format(_parse_gh(raw))
+    try:
+        response = client.get(
+            SEARCH_URL, params=_api_params(query, language, topic, owner, sort, limit)
+        )
+    except httpx.HTTPError as e:
+        raise _SearchError(f"Error: {e}")
+    return _format(_parse_api(response))
+
+
+async def _search_async(
+    query: str,
+    language: str,
+    topic: str,
+    owner: str,
+    sort: str,
+    limit: int,
+) -> str:
+    client = await _get_async_client()
+    if client is None:
+        raw = await _run_gh_async(_gh_args(query, language, topic, owner, sort, limit))
+        return _format(_parse_gh(raw))
+    try:
+        response = await client.get(
+            SEARCH_URL, params=_api_params(query, language, topic, owner, sort, limit)
+        )
+        await response.aread()
+    except httpx.HTTPError as e:
+        raise _SearchError(f"Error: {e}")
+    return _format(_parse_api(response))
+
+
+def _canon(value: str) -> str:
+    return " ".join(value.lower().split())
+
+
+def _canon_query(query: str) -> str:
+    # Only uppercase AND/OR/NOT are operators; lowercased they are search terms.
+    return " ".join(w if w in _SEARCH_OPERATORS else w.lower() for w in query.split())
+
+
+def _canon_topics(topic: str) -> str:
+    return ",".join(sorted({t for t in map(_canon, topic.split(",")) if t}))
 
 
 @server.tool()
-def search_repos(
+async def search_repos(
     query: str,
     language: str = "",
     topic: str = "",
@@ -83,7 +454,8 @@ def search_repos(
     Returns JSON with repo name, description, stars, language, and URL.
 
     Args:
-        query: Search terms. Use quotes for exact phrases, e.g. "vim plugin".
+        query: Search terms. Each word is matched separately; wrap a phrase in
+               double quotes to match it exactly, e.g. '"vim plugin" lua'.
                Supports GitHub search syntax like "topic:cli language:python".
         language: Filter by programming language, e.g. "python", "go", "rust".
         topic: Filter by topic, e.g. "cli" or "mcp-server". Comma-separate multiple.
@@ -91,48 +463,135 @@ def search_repos(
         sort: Sort by: stars, best-match, forks, updated, help-wanted-issues. Default: stars.
         limit: Max results to return (1-30, default 20).
     """
-    limit = min(max(limit, 1), 30)
-    args = [
-        "search", "repos", query,
-        "--json", "fullName,description,stargazersCount,language,url",
-        "--limit", str(limit),
-    ]
-    if sort != "best-match":
-        args.extend(["--sort", sort])
-    if language:
-        args.extend(["--language", language])
-    if topic:
-        for t in topic.split(","):
-            args.extend(["--topic", t.strip()])
-    if owner:
-        args.extend(["--owner", owner])
+    try:
+        return await _async_search(query, language, topic, owner, sort, limit)
+    except _SearchError as e:
+        return str(e)
+
 
-    raw = _run_gh(args)
-    if raw.startswith("Error:"):
-        return raw
+class Query(BaseModel):
+    """One search in a search_repos_batch call; see search_repos for the fields."""
 
+    model_config = ConfigDict(extra="forbid")
+
+    query: str
+    language: str = ""
+    topic: str = ""
+    owner: str = ""
+    sort: str = "stars"
+    limit: int = 20
+
+
+@server.tool()
+async def search_repos_batch(queries: list[Query]) -> str:
+    """Run several GitHub repository searches at once.
+
+    Prefer this over repeated search_repos calls when trying related queries.
+    Returns JSON with one result per query, in the same order.
+
+    Args:
+        queries: Searches to run. Each takes the search_repos arguments,
+                 e.g. {"query": "vim plugin", "language": "lua"}.
+                 Only "query" is required.
+    """
+    results = await asyncio.gather(
+        *(_batch_result(q) for q in queries), return_exceptions=True
+    )
+    # One failing query must not lose the results of the others.
+    return orjson.dumps({
+        "results": [f"Error: {r}" if isinstance(r, Exception) else r for r in results],
+    }).decode()
+
+
+async def _batch_result(q: Query) -> str | orjson.Fragment:
     try:
-        repos = json.loads(raw)
-    except json.JSONDecodeError:
-        return raw
+        payload = await _async_search(**q.model_dump())
+    except _SearchError as e:
+        return str(e)
+    if payload == NO_RESULTS:
+        return payload
+    # Embed the JSON payload as-is rather than as an escaped string.
+    return orjson.Fragment(payload)
 
-    if not repos:
-        return "No repositories found. Try broader or different search terms."
 
-    results = []
-    for r in repos:
-        desc = r.get("description") or ""
-        if len(desc) > 1000:
-            desc = desc[:997] + "..."
-        results.append({
-            "name": r["fullName"],
-            "stars": r.get("stargazersCount", 0),
-            "language": r.get("language") or "?",
-            "description": desc,
-            "url": r["url"],
-        })
+async def _async_search(
+    query: str,
+    language: str = "",
+    topic: str = "",
+    owner: str = "",
+    sort: str = "stars",
+    limit: int = 20,
+) -> str:
+    # Search terms and qualifiers are matched case-insensitively, so
+    # searching with the canonical form returns the same results and lets
+    # more calls share a cache entry.
+    key = (
+        _canon_query(query),
+        _canon(language),
+        _canon_topics(topic),
+        _canon(owner),
+        _canon(sort),
+        min(max(limit, 1), 30),
+    )
+    payload = _cache.get(key)
+    if payload is not None:
+        return payload
+    if _disk_cache is not None:
+        # The first lookup may shell out to `gh auth token`.
+        scope = _cache_scope or await asyncio.to_thread(_get_cache_scope)
+        entry = _disk_cache.get((scope, *key))
+        if entry is not None:
+            expiry, payload = entry
+            _cache.set(key, payload, expiry)
+            return payload
+
+    # Identical searches that arrive while one is running share its task.
+    # The task is shielded so that cancelling one caller leaves the others.
+    task = _inflight.get(key)
+    if task is None:
+        task = asyncio.ensure_future(_fetch(key))
+        _inflight[key] = task
+        task.add_done_callback(functools.partial(_fetch_done, key))
+    return await asyncio.shield(task)
+
+
+def _fetch_done(key: tuple, task: asyncio.Task):
+    del _inflight[key]
+    # Mark any exception as retrieved in case every caller was cancelled.
+    if not task.cancelled():
+        task.exception()
 
-    return json.dumps({"count": len(results), "repos": results}, indent=2)
+
+async def _fetch(key: tuple) -> str:
+    async with _sem:
+        if SYNC_SEARCH:
+            payload = await asyncio.to_thread(_search, *key)
+        else:
+            payload = await _search_async(*key)
+    _cache.set(key, payload)
+    if _disk_cache is not None:
+        _disk_cache.set((_get_cache_scope(), *key), payload)
+    return payload
+
+
+def _warm_up():
+    # Look up the token (usually `gh auth token`) before the first search needs it.
+    try:
+        _get_cache_scope()
+        if SYNC_SEARCH:
+            client = _get_client()
+            if client is not None:
+                client.get(RATE_LIMIT_URL)
+    except (OSError, subprocess.SubprocessError, httpx.HTTPError):
+        pass
+
+
+def _open_disk_cache():
+    global _disk_cache
+    try:
+        _disk_cache = DiskCache(CACHE_FILE, CACHE_TTL)
+    except (OSError, sqlite3.Error) as e:
+        print(f"Warning: persistent cache disabled: {e}", file=sys.stderr)
 
 
 def main():
@@ -151,7 +610,13 @@ def main():
         print(f"Saved gh path: {config['gh_path']}")
         sys.exit(0)
 
-    server.run(transport="stdio")
+    threading.Thread(target=_warm_up, daemon=True).start()
+    _open_disk_cache()
+    try:
+        server.run(transport="stdio")
+    finally:
+        if _disk_cache is not None:
+            _disk_cache.close()
 
 
 if __name__ == "__main__":